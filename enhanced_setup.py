@@ -7,8 +7,18 @@ Customized by ADCarthan88 for improved user experience and data validation
 import os
 import sys
 import subprocess
-import pandas as pd
-from pathlib import Path
+from importlib.metadata import distribution, PackageNotFoundError
+
+# CSV files in the working directory that are not Tastyworks exports
+EXCLUDED_CSV_FILES = frozenset({'eurusd.csv', 'test_output.csv', 'sample_transactions.csv'})
+
+def _is_candidate_csv(entry):
+    """Check if a directory entry could be a Tastyworks export"""
+    if not entry.name.endswith('.csv') or entry.name.startswith('.'):
+        return False
+    if entry.name in EXCLUDED_CSV_FILES:
+        return False
+    return entry.is_file(follow_symlinks=False)
 
 def check_dependencies():
     """Check if all required dependencies are installed"""
@@ -18,10 +28,11 @@ def check_dependencies():
     missing_packages = []
     
     for package in required_packages:
+        # Only look up the installed metadata, importing pandas itself is slow
         try:
-            __import__(package)
+            distribution(package)
             print(f"[OK] {package} - OK")
-        except ImportError:
+        except PackageNotFoundError:
             missing_packages.append(package)
             print(f"[MISSING] {package} - MISSING")
     
@@ -137,17 +148,17 @@ def main():
     check_dependencies()
     
     # Step 2: Check for existing CSV files
-    csv_files = list(Path('.').glob('*.csv'))
-    csv_files = [f for f in csv_files if f.name not in ['eurusd.csv', 'test_output.csv', 'sample_transactions.csv']]
+    with os.scandir('.') as entries:
+        csv_files = [entry.name for entry in entries if _is_candidate_csv(entry)]
     
     if csv_files:
         print(f"\n[INFO] Found existing CSV files:")
         for i, csv_file in enumerate(csv_files, 1):
-            print(f"   {i}. {csv_file.name}")
+            print(f"   {i}. {csv_file}")
         
         # Validate the first CSV file found
-        if validate_csv_format(str(csv_files[0])):
-            test_file = str(csv_files[0])
+        if validate_csv_format(csv_files[0]):
+            test_file = csv_files[0]
         else:
             print("[WARN] Creating sample data for testing instead...")
             test_file = create_sample_data()
@@ -30,7 +30,7 @@
 
 import csv
 import enum
-from io import StringIO
+from io import BufferedReader, RawIOBase
 import sys
 import os
 from collections import deque
@@ -1263,12 +1263,26 @@ def price_from_description(description: str) -> float:
     price = float(parts[-1].strip())
     return price
 
-def transform_csv(csv_file: str) -> str:
+READ_BUFFER_SIZE = 1 << 20
+
+def open_sequential(csv_file: str, mode: str = 'r'):
+    """
+    Open a file for one front-to-back pass: use a large read buffer and
+    (where supported) tell the kernel to read ahead aggressively.
+    """
+    encoding = None if 'b' in mode else 'UTF8'
+    f = open(csv_file, mode, buffering=READ_BUFFER_SIZE, encoding=encoding)
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return f
+
+def transform_csv_iter(csv_file: str):
     """
     Transform the CSV file data from new data format back to the old data format.
+    Yields the header and then one transformed line per row as UTF-8 bytes.
     """
-    transformed_data = 'Date/Time,Transaction Code,Transaction Subcode,Symbol,Buy/Sell,Open/Close,Quantity,Expiration Date,Strike,Call/Put,Price,Fees,Amount,Description,Account Reference'
-    with open(csv_file, encoding='UTF8') as f:
+    yield b'Date/Time,Transaction Code,Transaction Subcode,Symbol,Buy/Sell,Open/Close,Quantity,Expiration Date,Strike,Call/Put,Price,Fees,Amount,Description,Account Reference\n'
+    with open_sequential(csv_file) as f:
         reader = csv.reader(f, delimiter=',')
         for row in reader:
             if row[0] == 'Date':
@@ -1324,9 +1338,128 @@ def transform_csv(csv_file: str) -> str:
 
             account_refrerence = 'account'
 
-            transformed_data += f'\n{date},{transaction_code},{transaction_subcode},{symbol},{buy_sell},{open_close},{quantity},{expiration_date},{strike},{call_put},{price},{fees},{amount},{description},{account_refrerence}'
+            yield f'{date},{transaction_code},{transaction_subcode},{symbol},{buy_sell},{open_close},{quantity},{expiration_date},{strike},{call_put},{price},{fees},{amount},{description},{account_refrerence}\n'.encode('UTF8')
+
+def transform_csv(csv_file: str) -> str:
+    """
+    Transform the CSV file data from new data format back to the old data format.
+    """
+    return b''.join(transform_csv_iter(csv_file)).decode('UTF8')
+
+class LineIterReader(RawIOBase):
+    """
+    Read-only binary file object on top of an iterator of bytes lines.
+    Lets csv parsers consume transform_csv_iter() without building one big string.
+    """
+    def __init__(self, lines):
+        super().__init__()
+        self._lines = iter(lines)
+        self._pending = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast('B')
+        size = 0
+        while size < len(view):
+            if not self._pending:
+                self._pending = next(self._lines, b'')
+                if not self._pending:
+                    break
+            n = min(len(view) - size, len(self._pending))
+            view[size:size + n] = self._pending[:n]
+            self._pending = self._pending[n:]
+            size += n
+        return size
+
+def open_transformed_csv(csv_file: str) -> BufferedReader:
+    """
+    Return a buffered binary stream with the csv file converted to the old data format.
+    """
+    return BufferedReader(LineIterReader(transform_csv_iter(csv_file)), 1 << 20)
 
-    return transformed_data
+def transform_csv_arrow(csv_file: str):
+    """
+    Transform the CSV file data from new data format back to the old data format
+    with pyarrow compute kernels instead of Python code per row.
+    Same result as transform_csv(), but returned as typed pyarrow.Table.
+    Raises ImportError if pyarrow is not installed.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+
+    used_columns = ['Date', 'Type', 'Sub Type', 'Action', 'Symbol', 'Description', 'Value',
+        'Quantity', 'Commissions', 'Fees', 'Expiration Date', 'Strike Price', 'Call or Put']
+    t = pacsv.read_csv(csv_file, convert_options=pacsv.ConvertOptions(include_columns=used_columns,
+        column_types={c: pa.string() for c in used_columns}))
+    null = pa.scalar(None, pa.string())
+
+    def empty_to_null(a):
+        return pc.if_else(pc.equal(a, ''), null, a)
+
+    def to_text(a):
+        # Like pandas.read_csv(): empty fields are missing, a column without any value is float
+        a = empty_to_null(a)
+        if a.null_count == len(a):
+            return pa.nulls(len(a), pa.float64())
+        return a
+
+    def to_number(a):
+        # Same type inference as pandas.read_csv(): int64, else float64, else keep text
+        a = empty_to_null(a)
+        for number_type in (pa.int64(), pa.float64()):
+            try:
+                return pc.cast(a, number_type)
+            except pa.ArrowInvalid:
+                pass
+        return a
+
+    # Convert ISO date to old date format (minutes only)
+    date = pc.strptime(pc.utf8_slice_codeunits(t['Date'], 0, 19), format='%Y-%m-%dT%H:%M:%S', unit='s')
+    date = pc.cast(pc.floor_temporal(date, unit='minute'), pa.timestamp('ns'))
+
+    symbol = t['Symbol']
+    symbol = pc.if_else(pc.starts_with(symbol, '.'), pc.utf8_slice_codeunits(symbol, 1), symbol)
+
+    # Extract buy/sell and open/close from action
+    action = t['Action']
+    buy_sell = pc.if_else(pc.starts_with(action, 'BUY'), 'Buy', pc.if_else(pc.starts_with(action, 'SELL'), 'Sell', ''))
+    open_close = pc.if_else(pc.ends_with(action, 'TO_OPEN'), 'Open', pc.if_else(pc.ends_with(action, 'TO_CLOSE'), 'Close', ''))
+
+    expiration_date = pc.strptime(empty_to_null(t['Expiration Date']), format='%m/%d/%y', unit='s')
+    expiration_date = pc.strftime(expiration_date, format='%m/%d/%Y')
+
+    # Same as price_from_description(): the number after the last '@' of a trade
+    description = t['Description']
+    price = pc.extract_regex(description, r'^(?:Bought|Sold).*@(?P<price>[^@]*)$')
+    price = pc.cast(pc.utf8_trim_whitespace(pc.struct_field(price, 'price')), pa.float64())
+    price = pc.fill_null(price, 0.0)
+
+    commission = t['Commissions']
+    commission = pc.if_else(pc.match_substring_regex(commission, r'^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$'),
+        commission, null)
+    fees = pc.add(pc.cast(t['Fees'], pa.float64()), pc.fill_null(pc.cast(commission, pa.float64()), 0.0))
+    fees = pc.abs(fees) # Fees are always positive in the old format
+
+    return pa.table({
+        'Date/Time': date,
+        'Transaction Code': to_text(t['Type']),
+        'Transaction Subcode': to_text(t['Sub Type']),
+        'Symbol': to_text(symbol),
+        'Buy/Sell': to_text(buy_sell),
+        'Open/Close': to_text(open_close),
+        'Quantity': to_number(t['Quantity']),
+        'Expiration Date': to_text(expiration_date),
+        'Strike': to_number(t['Strike Price']),
+        'Call/Put': to_text(pc.utf8_slice_codeunits(t['Call or Put'], 0, 1)),
+        'Price': price,
+        'Fees': fees,
+        'Amount': to_number(pc.replace_substring(t['Value'], ',', '')),
+        'Description': to_text(description),
+        'Account Reference': pa.repeat('account', t.num_rows),
+    })
 
 def is_legacy_csv(csv_file) -> bool:
     """ Checks the first line of the csv data file if the header fits the legacy or the current format.
@@ -1339,10 +1472,10 @@ def is_legacy_csv(csv_file) -> bool:
         		'Average Price,Commissions,Fees,Multiplier,Root Symbol,Underlying Symbol,Expiration Date,' + \
                 'Strike Price,Call or Put,Order #,Total,Currency\n'
     with open(csv_file, encoding='UTF8') as f:
-        content = f.readlines()
-    if content[0] == header_legacy:
+        first_line = f.readline()
+    if first_line == header_legacy:
         legacy_format = True
-    elif content[0] == header:
+    elif first_line == header:
         legacy_format = False
     else:
         print('ERROR: Wrong first line in csv file. Please download trade history from the Tastytrade app!')
@@ -1352,10 +1485,21 @@ def is_legacy_csv(csv_file) -> bool:
 def read_csv_tasty(csv_file: str) -> pandas.DataFrame:
     """ Read the csv file from tastytrade and return a pandas DataFrame.
     """
-    csv_string = csv_file
-    if not is_legacy_csv(csv_file):
-        csv_string = StringIO(transform_csv(csv_file))
-    wk = pandas.read_csv(csv_string, parse_dates=['Date/Time'])
+    if is_legacy_csv(csv_file):
+        with open_sequential(csv_file, 'rb') as f:
+            wk = pandas.read_csv(f, parse_dates=['Date/Time'])
+    else:
+        try:
+            wk = transform_csv_arrow(csv_file).to_pandas()
+            # pyarrow turns missing text into None, pandas.read_csv() into nan:
+            for i in wk.columns[wk.dtypes == object]:
+                wk[i] = wk[i].where(wk[i].notna(), math.nan)
+        except (ImportError, ValueError, KeyError):
+            # No pyarrow, rows pyarrow rejects (e.g. a wrong number of fields) or
+            # a missing column (ArrowKeyError), which the row-by-row transform
+            # tolerates: use the python code
+            with open_transformed_csv(csv_file) as f:
+                wk = pandas.read_csv(f, parse_dates=['Date/Time'])
     #print(wk.info())
     #print(wk.head())
     #print(wk.memory_usage(deep=True))
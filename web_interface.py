@@ -6,9 +6,19 @@ Customized by ADCarthan88
 """
 
 try:
-    from flask import Flask, request, render_template_string, send_file, flash, redirect, url_for
+    from flask import Flask, request, render_template, send_file, flash, redirect, url_for
+    import contextlib
+    import io
+    import multiprocessing
     import os
+    import shutil
+    import sys
     import tempfile
+    import threading
+    import time
+    import uuid
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
     from werkzeug.utils import secure_filename
     import tw_pnl
     FLASK_AVAILABLE = True
@@ -18,16 +28,72 @@ except ImportError:
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Behind a proxy that understands X-Sendfile (Apache mod_xsendfile, or nginx with an
+# X-Accel-Redirect mapping) let the proxy stream downloads instead of Python.
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE') == '1'
 
-UPLOAD_FOLDER = 'uploads'
+UPLOAD_FOLDER = os.path.abspath('uploads')
+# Uploads are at most 16MB: keep them and their reports in RAM if tmpfs is available
+SHM_FOLDER = '/dev/shm'
 ALLOWED_EXTENSIONS = {'csv'}
 
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
+COPY_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+def make_executor():
+    """Create the process pool for the tax calculations"""
+    # Never fork() the multi-threaded web server, start workers from a clean process
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    options = {}
+    if sys.version_info >= (3, 11):
+        # tw_pnl keeps its options in module globals: a fresh process for every
+        # job keeps one user's settings out of the next user's calculation
+        options['max_tasks_per_child'] = 1
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context(method), **options)
+
+# Tax calculations run in worker processes (pandas work is GIL-bound), so one
+# upload does not block the web server for everyone else. The pool is created on
+# first use, pool workers that import this module do not start pools of their own.
+EXECUTOR = None
+EXECUTOR_LOCK = threading.Lock()
+JOBS = {}  # job_id -> (future, workdir, output_path, output_filename, submitted)
+JOB_TTL = 60 * 60  # seconds until a job nobody picked up is dropped with its files
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def make_workdir():
+    """Create a private directory for one upload and the reports generated from it"""
+    if os.path.isdir(SHM_FOLDER) and not app.use_x_sendfile:
+        return tempfile.mkdtemp(prefix='tw-pnl-', dir=SHM_FOLDER)
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    return tempfile.mkdtemp(prefix='tw-pnl-', dir=UPLOAD_FOLDER)
+
+def save_upload(file, filepath):
+    """Save an uploaded file with as few read/write calls as possible"""
+    src = file.stream
+    with open(filepath, 'wb') as dst:
+        # Large uploads are spooled by werkzeug to a real temporary file:
+        # on Linux copy that in-kernel with sendfile() instead of through Python.
+        # Small ones are still in memory (fileno() would first roll them over to disk).
+        if sys.platform.startswith('linux') and getattr(src, '_rolled', True):
+            try:
+                src_fd = src.fileno()
+            except (AttributeError, OSError):
+                src_fd = None
+            if src_fd is not None:
+                offset = src.tell()
+                size = os.fstat(src_fd).st_size
+                try:
+                    while offset < size:
+                        sent = os.sendfile(dst.fileno(), src_fd, offset, size - offset)
+                        if sent == 0:
+                            break
+                        offset += sent
+                    return
+                except OSError:
+                    src.seek(offset)
+        shutil.copyfileobj(src, dst, length=COPY_BUFFER_SIZE)
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
@@ -140,6 +206,88 @@ HTML_TEMPLATE = """
 </html>
 """
 
+STATUS_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    {% if not done %}<meta http-equiv="refresh" content="2">{% endif %}
+    <title>German Tax Calculator for Tastyworks</title>
+    <style>
+        body { font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto; padding: 20px; }
+        .header { background: #2c3e50; color: white; padding: 20px; border-radius: 8px; margin-bottom: 20px; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>🇩🇪 German Tax Calculator for Tastyworks</h1>
+        {% if done %}
+        <p>✅ Tax report generated successfully!</p>
+        {% else %}
+        <p>⏳ Calculating tax report for {{ output_filename }} - this page refreshes automatically</p>
+        {% endif %}
+    </div>
+    {% if done %}
+    <p><a href="{{ url_for('download', job_id=job_id) }}">📥 Download {{ output_filename }}</a>
+       (the uploaded file and the report are deleted after the download)</p>
+    <p><a href="{{ url_for('index') }}">Calculate another report</a></p>
+    {% endif %}
+</body>
+</html>
+"""
+
+# Parse and compile the templates once instead of on every request
+INDEX_TPL = app.jinja_env.from_string(HTML_TEMPLATE)
+STATUS_TPL = app.jinja_env.from_string(STATUS_TEMPLATE)
+
+def get_executor(broken=None):
+    """Return the process pool, replacing it if it is the broken one"""
+    global EXECUTOR
+    with EXECUTOR_LOCK:
+        # Several threads may notice the same broken pool, only the first replaces it
+        if EXECUTOR is None or EXECUTOR is broken:
+            if EXECUTOR is not None:
+                EXECUTOR.shutdown(wait=False)
+            EXECUTOR = make_executor()
+        return EXECUTOR
+
+def submit_job(fn, *args):
+    """Run fn in the process pool, with a new pool if a worker died (e.g. killed when out of memory)"""
+    executor = get_executor()
+    try:
+        return executor.submit(fn, *args)
+    except BrokenProcessPool:
+        return get_executor(broken=executor).submit(fn, *args)
+
+def run_tax_calculation(args):
+    """Run tw_pnl in a pool worker, turning its sys.exit() into an error with the printed reason"""
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            tw_pnl.main(args)
+    except SystemExit:
+        # tw_pnl prints 'ERROR: <reason>' before it exits
+        errors = [line[len('ERROR: '):] for line in output.getvalue().splitlines() if line.startswith('ERROR: ')]
+        raise RuntimeError(errors[-1] if errors else 'Unsupported CSV format') from None
+    finally:
+        sys.stdout.write(output.getvalue())
+
+def remove_job(job_id):
+    """Forget a job and delete its upload folder once the calculation has stopped"""
+    job = JOBS.pop(job_id, None)
+    if job is not None:
+        future, workdir = job[0], job[1]
+        future.cancel()
+        future.add_done_callback(lambda _: shutil.rmtree(workdir, ignore_errors=True))
+
+@app.before_request
+def expire_jobs():
+    # Jobs are normally removed when their status is polled, this catches closed browser tabs
+    now = time.monotonic()
+    for job_id, job in list(JOBS.items()):
+        if now - job[4] > JOB_TTL:
+            remove_job(job_id)
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
@@ -153,10 +301,13 @@ def index():
             return redirect(request.url)
         
         if file and allowed_file(file.filename):
+            workdir = None
             try:
+                # Every upload gets its own directory, so equal file names cannot collide
+                workdir = make_workdir()
                 filename = secure_filename(file.filename)
-                filepath = os.path.join(UPLOAD_FOLDER, filename)
-                file.save(filepath)
+                filepath = os.path.join(workdir, filename)
+                save_upload(file, filepath)
                 
                 # Get form parameters
                 tax_year = request.form.get('tax_year')
@@ -170,7 +321,7 @@ def index():
                 else:
                     output_filename = f"{base_name}_tax_report.csv"
                 
-                output_path = os.path.join(UPLOAD_FOLDER, output_filename)
+                output_path = os.path.join(workdir, output_filename)
                 
                 # Prepare arguments for tw_pnl
                 args = []
@@ -181,25 +332,72 @@ def index():
                 args.append(f'--output-csv={output_path}')
                 
                 if include_summary:
-                    summary_path = os.path.join(UPLOAD_FOLDER, f"{base_name}_summary.csv")
+                    summary_path = os.path.join(workdir, f"{base_name}_summary.csv")
                     args.append(f'--summary={summary_path}')
                 
                 args.append(filepath)
                 
-                # Run the calculation
-                tw_pnl.main(args)
-                
-                flash(f'Tax report generated successfully! Download: {output_filename}')
-                return send_file(output_path, as_attachment=True, download_name=output_filename)
+                # Run the calculation in the background and poll for the result
+                job_id = uuid.uuid4().hex
+                JOBS[job_id] = (submit_job(run_tax_calculation, args), workdir, output_path, output_filename,
+                                time.monotonic())
+                return redirect(url_for('status', job_id=job_id))
                 
             except Exception as e:
+                if workdir is not None:
+                    shutil.rmtree(workdir, ignore_errors=True)
                 flash(f'Error processing file: {str(e)}')
                 return redirect(request.url)
         else:
             flash('Invalid file type. Please upload a CSV file.')
             return redirect(request.url)
     
-    return render_template_string(HTML_TEMPLATE)
+    return render_template(INDEX_TPL)
+
+@app.route('/status/<job_id>')
+def status(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        flash('Unknown or expired job')
+        return redirect(url_for('index'))
+    
+    future, workdir, output_path, output_filename, _ = job
+    if not future.done():
+        return render_template(STATUS_TPL, done=False, output_filename=output_filename)
+    
+    try:
+        future.result()
+    except BrokenProcessPool:
+        error = 'the calculation was aborted (file too large?), please try again'
+    except Exception as e:
+        error = str(e)
+    else:
+        return render_template(STATUS_TPL, done=True, job_id=job_id, output_filename=output_filename)
+    
+    # Only one of several concurrent polls of a failed job cleans up
+    if JOBS.pop(job_id, None) is not None:
+        # A dead worker is replaced by submit_job() for the next upload
+        shutil.rmtree(workdir, ignore_errors=True)
+    flash(f'Error processing file: {error}')
+    return redirect(url_for('index'))
+
+@app.route('/download/<job_id>')
+def download(job_id):
+    job = JOBS.get(job_id)
+    if job is not None and (not job[0].done() or job[0].exception() is not None):
+        return redirect(url_for('status', job_id=job_id))
+    # Only one of several concurrent downloads gets the report
+    if job is None or JOBS.pop(job_id, None) is None:
+        flash('Unknown or expired job')
+        return redirect(url_for('index'))
+    
+    future, workdir, output_path, output_filename, _ = job
+    response = send_file(output_path, as_attachment=True, download_name=output_filename)
+    # send_file() has already opened the report, so the upload and its reports can go.
+    # With X-Sendfile the proxy still needs the file and cleans up the upload folder itself.
+    if not app.use_x_sendfile:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return response
 
 def main():
     if not FLASK_AVAILABLE:
@@ -211,7 +409,19 @@ def main():
     print("📍 Open your browser and go to: http://localhost:5000")
     print("🛑 Press Ctrl+C to stop the server")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        print("⚠️  gunicorn not installed, using the Flask development server (pip install gunicorn)")
+        app.run(debug=True, host='0.0.0.0', port=5000)
+        return
+    
+    # One worker process keeps the JOBS table shared between upload and status requests,
+    # threads serve concurrent requests, and gunicorn sends report files with sendfile().
+    threads = os.environ.get('WEB_THREADS', '8')
+    os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '--workers', '1', '--threads', threads,
+                               '--bind', '0.0.0.0:5000', '--chdir', os.path.dirname(os.path.abspath(__file__)),
+                               'web_interface:app'])
 
 if __name__ == '__main__':
     main()
\ No newline at end of file